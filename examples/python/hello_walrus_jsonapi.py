@@ -3,38 +3,27 @@
 
 # Std lib imports
 import os
-import subprocess
+import hashlib
 import json
 import tempfile
-import base64
 
-import requests
-
-from utils import num_to_blob_id, PATH_TO_WALRUS, PATH_TO_WALRUS_CONFIG, FULL_NODE_URL
+from utils import num_to_blob_id, sui_rpc, WalrusClient
 
 try:
-    # Create a 1MiB file of random data
+    # Create 1MiB of random data
     random_data = os.urandom(1024 * 1024)
-    tmp = tempfile.NamedTemporaryFile(delete=False)
-    tmp.write(random_data)
-    tmp.close()
+    random_data_digest = hashlib.sha256(random_data).digest()
 
-    # Part 1. Upload the file to the Walrus service
-    store_json_command = f"""{{ "config" : "{PATH_TO_WALRUS_CONFIG}",
-        "command" : {{ "store" :
-        {{ "file" : "{tmp.name}", "epochs" : 2  }}}}
-    }}"""
-    result = subprocess.run(
-        [PATH_TO_WALRUS, "json"],
-        text=True,
-        capture_output=True,
-        input=store_json_command,
-    )
+    # The downloaded blob is written directly to this file by the client
+    tmp_out = tempfile.NamedTemporaryFile(delete=False)
+    tmp_out.close()
 
-    assert result.returncode == 0
+    client = WalrusClient()
+
+    # Part 1. Upload the data to the Walrus service
+    json_result_dict = client.store_bytes(random_data, epochs=2)
 
     # Parse the response and display key information
-    json_result_dict = json.loads(result.stdout.strip())
     if "newlyCreated" in json_result_dict:
         blob_id = json_result_dict["newlyCreated"]["blobObject"]["blobId"]
         sui_object_id = json_result_dict["newlyCreated"]["blobObject"]["id"]
@@ -51,34 +40,23 @@ try:
     print(f"Certificate in Object ID: {sui_object_id}")
 
     # Part 2. Download the file from the Walrus service
-    read_json_command = f"""{{ "config" : "{PATH_TO_WALRUS_CONFIG}",
-        "command" : {{ "read" :
-        {{ "blobId" : "{blob_id}" }}}}
-    }}"""
-    result = subprocess.run(
-        [PATH_TO_WALRUS, "json"],
-        text=True,
-        capture_output=True,
-        input=read_json_command,
-    )
+    json_result_dict = client.read(blob_id, out=tmp_out.name)
 
-    assert result.returncode == 0
-
-    # Parse the response and display key information
-    json_result_dict = json.loads(result.stdout.strip())
-    downloaded_data = base64.b64decode(json_result_dict["blob"])
-    assert downloaded_data == random_data
+    # Check the downloaded data in chunks, without loading the whole blob into memory
+    downloaded_digest = hashlib.sha256()
+    with open(tmp_out.name, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            downloaded_digest.update(chunk)
+    assert downloaded_digest.digest() == random_data_digest
 
     print(
-        f"Download Blob ID: {json_result_dict['blobId']} Size {len(downloaded_data)} bytes"
+        f"Download Blob ID: {json_result_dict['blobId']} Size {os.path.getsize(tmp_out.name)} bytes"
     )
 
     # Part 3. Check the availability of the blob
-    request = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "sui_getObject",
-        "params": [
+    result = sui_rpc(
+        "sui_getObject",
+        [
             sui_object_id,
             {
                 "showType": True,
@@ -90,9 +68,8 @@ try:
                 "showStorageRebate": False,
             },
         ],
-    }
-    response = requests.post(FULL_NODE_URL, json=request)
-    object_content = response.json()["result"]["data"]["content"]
+    )
+    object_content = result["data"]["content"]
     print("Object content:")
     print(json.dumps(object_content, indent=4))
 
@@ -104,4 +81,4 @@ try:
         print("Blob ID does not match")
 
 finally:
-    os.unlink(tmp.name)
+    os.unlink(tmp_out.name)
@@ -1,22 +1,14 @@
 # Example of querying the Walrus system object on Sui
 
-# Std lib imports
-import requests
-import re
+from utils import load_walrus_config, sui_rpc
 
-from utils import PATH_TO_WALRUS_CONFIG
-
-system_object_id = re.findall(
-    r"system_object:[ ]*(.*)", open(PATH_TO_WALRUS_CONFIG).read()
-)[0]
+system_object_id = load_walrus_config()["system_object_id"]
 print(f"System object ID: {system_object_id}")
 
 # Query the Walrus system object on Sui
-request = {
-    "jsonrpc": "2.0",
-    "id": 1,
-    "method": "sui_getObject",
-    "params": [
+result = sui_rpc(
+    "sui_getObject",
+    [
         system_object_id,
         {
             "showType": True,
@@ -28,11 +20,9 @@ request = {
             "showStorageRebate": False,
         },
     ],
-}
-response = requests.post("https://fullnode.testnet.sui.io:443", json=request)
-assert response.status_code == 200
+)
 
-system_object_content = response.json()["result"]["data"]["content"]["fields"]
+system_object_content = result["data"]["content"]["fields"]
 committee = system_object_content["current_committee"]["fields"]["bls_committee"][
     "fields"
 ]
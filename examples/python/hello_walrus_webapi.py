@@ -8,6 +8,7 @@
 #
 
 # Std lib imports
+import hashlib
 import os
 import time
 
@@ -16,6 +17,34 @@ import requests
 
 ADDRESS = "127.0.0.1:31415"
 EPOCHS = "5"
+CHUNK_SIZE = 64 * 1024
+
+
+# Random data generated in chunks as it is uploaded, with a known total size
+#
+# Requests sends iterables with a length as a streamed body with a `Content-Length` header.
+# The data is hashed while it is generated, so it never needs to be held in memory. Each
+# iteration produces new data, so the hash and generation time only cover the latest one.
+class RandomData:
+    def __init__(self, size):
+        self.size = size
+        self.hasher = hashlib.blake2b()
+        self.generation_time = 0.0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        self.hasher = hashlib.blake2b()
+        self.generation_time = 0.0
+        remaining = self.size
+        while remaining > 0:
+            chunk_start_time = time.time()
+            chunk = os.urandom(min(CHUNK_SIZE, remaining))
+            self.hasher.update(chunk)
+            self.generation_time += time.time() - chunk_start_time
+            remaining -= len(chunk)
+            yield chunk
 
 
 # Helper functions to upload a blob
@@ -30,34 +59,40 @@ def upload_blob(ADDRESS, EPOCHS, data):
     return blob_id
 
 
-# Helper functions to download a blob
+# Helper functions to download a blob, returns its BLAKE2b digest
 def download_blob(ADDRESS, blob_id):
     # Now read the same resource using the blob-id
     read_url = f"http://{ADDRESS}/v1/{blob_id}"
-    response = requests.get(read_url)
+    response = requests.get(read_url, stream=True)
 
     # Assert the response status code
     assert response.status_code == 200
-    return response.content
+
+    # Hash the blob as it arrives, instead of buffering it in memory
+    digest = hashlib.blake2b()
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.digest()
 
 
 # Upload a random 1MB string then download it, and check it matches
 if __name__ == "__main__":
-    # Generate a 1MB blob of random data
-    random_data = os.urandom(1024 * 1024)
+    # Generate a 1MB blob of random data, streamed during the upload
+    random_data = RandomData(1024 * 1024)
 
     # Upload the blob to the Walrus service
     start_time = time.time()
     blob_id = upload_blob(ADDRESS, EPOCHS, random_data)
     upload_time = time.time()
 
-    # Now download the same blob using the blob-id
-    data = download_blob(ADDRESS, blob_id)
-    assert data == random_data
+    # Now download the same blob using the blob-id, and check it matches
+    digest = download_blob(ADDRESS, blob_id)
+    assert digest == random_data.hasher.digest()
     download_time = time.time()
 
     # Print some information about the blob
     print(f"Blob ID: {blob_id}")
     print(f"Size {len(random_data)} bytes")
-    print(f"Upload time: {upload_time - start_time:.2f}s")
+    # Exclude generating and hashing the random data from the upload time
+    print(f"Upload time: {upload_time - start_time - random_data.generation_time:.2f}s")
     print(f"Download time: {download_time - upload_time:.2f}s")
@@ -1,21 +1,171 @@
-import base64
+import functools
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Use the SIMD accelerated pybase64 if available, it is API compatible with base64
+try:
+    import pybase64 as _b64
+except ImportError:
+    import base64 as _b64
+
+# Use the faster orjson for encoding and decoding JSON if available, `_json_dumps` returns bytes
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj).encode()
+
+    _json_loads = json.loads
 
 # Configure these paths to match your system
 FULL_NODE_URL = "https://fullnode.testnet.sui.io:443"
 PATH_TO_WALRUS = "../CONFIG/bin/walrus"
 PATH_TO_WALRUS_CONFIG = "../CONFIG/config_dir/client_config.yaml"
 
+# A shared HTTP session, so that requests to the full node reuse the same TLS connection
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
+_SYSTEM_OBJECT_RE = re.compile(r"system_object:[ ]*(.*)")
+_WALRUS_PACKAGE_RE = re.compile(r"(0x[0-9a-f]+)::system")
+
+
+# Call a Sui JSON-RPC method on the full node and return its result
+def sui_rpc(method, params):
+    request = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": method,
+        "params": params,
+    }
+    response = SESSION.post(
+        FULL_NODE_URL,
+        data=_json_dumps(request),
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 200
+    return _json_loads(response.content)["result"]
+
+
+# Read the Walrus client configuration, parsed once per process
+@functools.lru_cache(maxsize=1)
+def load_walrus_config():
+    with open(PATH_TO_WALRUS_CONFIG) as f:
+        config = f.read()
+    return {"system_object_id": _SYSTEM_OBJECT_RE.search(config).group(1)}
+
+
+# Resolve the Walrus package ID from the type of the system object
+@functools.lru_cache(maxsize=1)
+def load_walrus_package():
+    result = sui_rpc(
+        "sui_getObject",
+        [
+            load_walrus_config()["system_object_id"],
+            {
+                "showType": True,
+                "showOwner": False,
+                "showPreviousTransaction": False,
+                "showDisplay": False,
+                "showContent": False,
+                "showBcs": False,
+                "showStorageRebate": False,
+            },
+        ],
+    )
+    system_object_type = result["data"]["type"]
+    return _WALRUS_PACKAGE_RE.search(system_object_type).group(1)
+
 
 # Convert a numeric (u256) blob_id to a base64 encoded Blob ID
 def num_to_blob_id(blob_id_num):
-    extracted_bytes = []
-    for i in range(32):
-        extracted_bytes += [blob_id_num & 0xFF]
-        blob_id_num = blob_id_num >> 8
-    assert blob_id_num == 0
-    blob_id_bytes = bytes(extracted_bytes)
-    encoded = base64.urlsafe_b64encode(blob_id_bytes)
-    return encoded.decode("ascii").strip("=")
+    if blob_id_num.bit_length() > 256:
+        raise ValueError(f"Blob ID {blob_id_num} does not fit in 32 bytes")
+    blob_id_bytes = blob_id_num.to_bytes(32, "little")
+    encoded = _b64.urlsafe_b64encode(blob_id_bytes)
+    return encoded.rstrip(b"=").decode("ascii")
+
+
+# A thin client for the JSON mode of the Walrus CLI
+#
+# The `walrus json` command reads a single command from stdin and exits, so each call runs one
+# process. The client keeps the binary and configuration in one place and serializes the commands
+# as JSON, so that paths containing quotes are escaped correctly.
+class WalrusClient:
+    def __init__(self, path_to_walrus=PATH_TO_WALRUS, config=PATH_TO_WALRUS_CONFIG):
+        self.path_to_walrus = path_to_walrus
+        self.config = config
+
+    # Run a single JSON mode command and return the parsed JSON output
+    def run(self, command, pass_fds=()):
+        result = subprocess.run(
+            [self.path_to_walrus, "json"],
+            text=True,
+            capture_output=True,
+            input=_json_dumps({"config": self.config, "command": command}).decode(),
+            pass_fds=pass_fds,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"walrus json failed: {result.stderr.strip()}")
+        return _json_loads(result.stdout)
+
+    def store(self, path, epochs):
+        return self.run({"store": {"file": path, "epochs": epochs}})
+
+    # Store in-memory data by writing it to a temporary file
+    #
+    # With `use_pipe=True` the data is instead streamed to the client through a `/dev/fd` pipe,
+    # avoiding the round-trip through the disk. This requires a system with `/dev/fd` and a
+    # client that accepts a pipe as its input file.
+    def store_bytes(self, data, epochs, use_pipe=False):
+        if use_pipe:
+            return self._store_through_pipe(data, epochs)
+
+        tmp = tempfile.NamedTemporaryFile(delete=False)
+        try:
+            tmp.write(data)
+            tmp.close()
+            return self.store(tmp.name, epochs)
+        finally:
+            os.unlink(tmp.name)
+
+    def _store_through_pipe(self, data, epochs):
+        read_fd, write_fd = os.pipe()
+
+        def feed_pipe():
+            with os.fdopen(write_fd, "wb") as pipe:
+                try:
+                    pipe.write(data)
+                except BrokenPipeError:
+                    # The client exited without reading all the data, `run` reports the error
+                    pass
+
+        writer = threading.Thread(target=feed_pipe)
+        writer.start()
+        try:
+            return self.run(
+                {"store": {"file": f"/dev/fd/{read_fd}", "epochs": epochs}},
+                pass_fds=(read_fd,),
+            )
+        finally:
+            os.close(read_fd)
+            writer.join()
+
+    def read(self, blob_id, out=None):
+        read_command = {"blobId": blob_id}
+        if out is not None:
+            read_command["out"] = out
+        return self.run({"read": read_command})
 
 
 if __name__ == "__main__":